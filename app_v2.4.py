@@ -1,8 +1,9 @@
+import os
 import sys
 from datetime import datetime
 
 from PySide6 import QtWidgets
-from PySide6.QtCore import QUrl, Qt
+from PySide6.QtCore import QUrl, Qt, QStringListModel, QThread, Signal
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -10,12 +11,18 @@ from PySide6.QtWidgets import (
     QTabWidget,
     QHBoxLayout,
     QTableView,
-    QMessageBox, QLineEdit, QWidgetAction, QMenu,
+    QMessageBox, QLineEdit, QWidgetAction, QMenu, QCompleter,
 )
-from PySide6.QtGui import QDesktopServices, QAction, QIcon, QKeySequence, QShortcut, QColor
+from PySide6.QtGui import QDesktopServices, QAction, QIcon, QKeySequence, QShortcut
 from PySide6.QtSql import QSqlDatabase, QSqlTableModel, QSqlQuery
 from PySide6.QtWidgets import QAbstractItemView
 
+from customers import (
+    CustomerIndex, ensure_customer_schema, import_clients_tsv, customer_history, link_rentals, outstanding_deposits,
+)
+from documents import DEFAULT_OUTPUT_DIR, generate_documents, load_rentals_for_day
+from row_styles import StatusTableModel, StatusDelegate, CAR_RULE, RENTAL_RULE
+
 
 # --- Database connection checker ---
 def connect_to_sqlite_db(db_file):
@@ -46,6 +53,32 @@ def wa_return_car_procedure():
     else:
         print(f"Failed to open: {url_to_open}")
 
+
+# --- Customer amounts are kept per currency ---
+def format_amounts(amounts):
+    parts = [f"{amount:.2f} {currency or '(no currency)'}" for currency, amount in sorted(amounts.items()) if amount]
+    return ", ".join(parts) or "-"
+
+
+# --- Document rendering off the UI thread ---
+class DocumentWorker(QThread):
+    rendered = Signal(int, int)
+    failed = Signal(str)
+
+    def __init__(self, records, parent=None):
+        super().__init__(parent)
+        self.records = records
+
+    def run(self):
+        # exceptions don't leave a QThread on their own, hand them to the window
+        try:
+            rendered, skipped = generate_documents(self.records, "contract", DEFAULT_OUTPUT_DIR)
+        except Exception as e:
+            self.failed.emit(f"{type(e).__name__}: {e}")
+            return
+        self.rendered.emit(rendered, skipped)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
             super().__init__()
@@ -57,6 +90,12 @@ class MainWindow(QMainWindow):
             if not self.db:
                 QMessageBox.critical(self, "Database Error", "Failed to connect to database.")
 
+            # --- Customer registry (in-memory index for instant lookup) ---
+            self.customer_index = CustomerIndex()
+            if self.db and ensure_customer_schema(self.db):
+                self.customer_index.load(self.db)
+                link_rentals(self.db, self.customer_index)
+
             # --- Menu Bar ---
             menu_bar = self.menuBar()
             file_menu = menu_bar.addMenu("&File")
@@ -72,6 +111,22 @@ class MainWindow(QMainWindow):
             toolbar.addWidget(self.search_box)
             toolbar.addSeparator()
 
+            # --- Customer lookup: suggestions update on every keystroke ---
+            self.customer_box = QLineEdit()
+            self.customer_box.setPlaceholderText("Customer name or phone...")
+            self.customer_box.setFixedWidth(220)
+            self.customer_matches = []
+            self.customer_completer_model = QStringListModel(self)
+            customer_completer = QCompleter(self.customer_completer_model, self)
+            # the index already did the filtering, show its results as they are
+            customer_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+            self.customer_box.setCompleter(customer_completer)
+            self.customer_box.textEdited.connect(self.update_customer_matches)
+            customer_completer.activated.connect(self.show_customer)
+
+            toolbar.addWidget(self.customer_box)
+            toolbar.addSeparator()
+
             action_ac = QAction("Available Cars - clipboard", self)
             action_ac.triggered.connect(self.clipboard_avail_cars)
             file_menu.addAction(action_ac)
@@ -86,6 +141,17 @@ class MainWindow(QMainWindow):
 
             file_menu.addSeparator()
 
+            self.action_pc = QAction("Print Today's Contracts", self)
+            self.action_pc.triggered.connect(self.print_todays_contracts)
+            file_menu.addAction(self.action_pc)
+            self.document_worker = None
+
+            action_ic = QAction("Import Customers from clients.tsv", self)
+            action_ic.triggered.connect(self.import_customers)
+            file_menu.addAction(action_ic)
+
+            file_menu.addSeparator()
+
             exit_action = QAction("Exit", self)
             exit_action.triggered.connect(self.close)
             file_menu.addAction(exit_action)
@@ -119,12 +185,15 @@ class MainWindow(QMainWindow):
 
             # --- Master Inventory (all cars) ---
             if self.db:
-                self.model_all_cars = QSqlTableModel(self, self.db)
+                self.model_all_cars = StatusTableModel(self, self.db, CAR_RULE)
                 self.model_all_cars.setTable("cars")
                 self.model_all_cars.select()
 
+                self.status_delegate = StatusDelegate(self)
+
                 self.table_view_all_cars = QTableView()
                 self.table_view_all_cars.setModel(self.model_all_cars)
+                self.table_view_all_cars.setItemDelegate(self.status_delegate)
                 self.table_view_all_cars.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
                 self.table_view_all_cars.resizeColumnsToContents()
                 self.table_view_all_cars.verticalHeader().setVisible(False)
@@ -151,12 +220,121 @@ class MainWindow(QMainWindow):
                 layout_avail = QHBoxLayout(self.tab_available_cars)
                 layout_avail.addWidget(self.table_view_available_cars)
 
+            # --- Rented Out ---
+            if self.db:
+                self.model_rentals = StatusTableModel(self, self.db, RENTAL_RULE)
+                self.model_rentals.setTable("rentals")
+                self.model_rentals.setFilter("is_returned = 0")
+                self.model_rentals.select()
+
+                self.table_view_rentals = QTableView()
+                self.table_view_rentals.setModel(self.model_rentals)
+                self.table_view_rentals.setItemDelegate(self.status_delegate)
+                self.table_view_rentals.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+                self.table_view_rentals.resizeColumnsToContents()
+                self.table_view_rentals.verticalHeader().setVisible(False)
+
+                layout_rentals = QHBoxLayout(self.tab_rentals)
+                layout_rentals.addWidget(self.table_view_rentals)
+
+            # --- Returning Soon (due back by tomorrow, overdue included) ---
+            if self.db:
+                self.model_returning = StatusTableModel(self, self.db, RENTAL_RULE)
+                self.model_returning.setTable("rentals")
+                self.model_returning.setFilter("is_returned = 0 AND date(return_date) <= date('now', 'localtime', '+1 day')")
+                self.model_returning.setSort(self.model_returning.fieldIndex("return_date"), Qt.SortOrder.AscendingOrder)
+                self.model_returning.select()
+
+                self.table_view_returning = QTableView()
+                self.table_view_returning.setModel(self.model_returning)
+                self.table_view_returning.setItemDelegate(self.status_delegate)
+                self.table_view_returning.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+                self.table_view_returning.resizeColumnsToContents()
+                self.table_view_returning.verticalHeader().setVisible(False)
+
+                layout_returning = QHBoxLayout(self.tab_returning_today)
+                layout_returning.addWidget(self.table_view_returning)
+
+                # Master Inventory colors depend on open rentals
+                self.model_all_cars.follow(self.model_rentals)
+                self.model_all_cars.follow(self.model_returning)
+
 
     def cycle_tabs(self):
         current = self.side_tabs.currentIndex()
         count = self.side_tabs.count()
         self.side_tabs.setCurrentIndex((current + 1) % count)
 
+    # --- Customer lookup ---
+    def update_customer_matches(self, text):
+        self.customer_matches = self.customer_index.lookup(text)
+        self.customer_completer_model.setStringList([
+            f"{c['name']}  {c['phone']}  ({c['rental_count']} rentals)" for c in self.customer_matches
+        ])
+
+    def show_customer(self, label):
+        customer = next(
+            (c for c in self.customer_matches if label.startswith(f"{c['name']}  {c['phone']}")), None
+        )
+        if customer is None:
+            return
+        lines = [
+            f"{customer['name']}",
+            f"Phone: {customer['phone'] or '-'}",
+            f"Rentals: {customer['rental_count']}",
+            f"Total spend: {format_amounts(customer['totals'])}",
+            f"Outstanding deposits: {format_amounts(outstanding_deposits(self.db, customer['id']))}",
+        ]
+        history = customer_history(self.db, customer["id"])
+        if history:
+            lines.append("")
+            for h in history:
+                lines.append(f"{h['rental_date']} - {h['return_date']}\t{h['car_code']} {h['car']}\t{h['status']}")
+        QMessageBox.information(self, "Customer", "\n".join(lines))
+
+    def import_customers(self):
+        if not self.db or not self.db.isOpen():
+            QMessageBox.warning(self, "Database Error", "Database connection is not open.")
+            return
+        result = import_clients_tsv(self.db, self.customer_index, "clients.tsv")
+        if result is None:
+            QMessageBox.critical(self, "Import Failed", "clients.tsv could not be imported, nothing was changed.")
+            return
+        imported, problems = result
+        message = f"{imported} new or changed rentals imported into the customer registry"
+        if problems:
+            message += f"\n\n{len(problems)} problems:\n" + "\n".join(problems[:15])
+            if len(problems) > 15:
+                message += f"\n... and {len(problems) - 15} more (see console)"
+        QMessageBox.information(self, "Imported", message)
+
+    # --- Contracts for today's handovers ---
+    def print_todays_contracts(self):
+        if not self.db or not self.db.isOpen():
+            QMessageBox.warning(self, "Database Error", "Database connection is not open.")
+            return
+        records = load_rentals_for_day(self.db, datetime.today().strftime("%Y-%m-%d"))
+        if not records:
+            QMessageBox.information(self, "No Results", "No rentals start today.")
+            return
+        # rendering can take a while, keep the window responsive and avoid starting a second batch meanwhile
+        self.action_pc.setEnabled(False)
+        self.statusBar().showMessage(f"Rendering {len(records)} contracts...")
+        self.document_worker = DocumentWorker(records, self)
+        self.document_worker.rendered.connect(self.contracts_rendered)
+        self.document_worker.failed.connect(self.contracts_failed)
+        self.document_worker.finished.connect(lambda: self.action_pc.setEnabled(True))
+        self.document_worker.start()
+
+    def contracts_rendered(self, rendered, skipped):
+        self.statusBar().clearMessage()
+        QMessageBox.information(self, "Contracts", f"{rendered} contracts rendered, {skipped} unchanged")
+        QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(DEFAULT_OUTPUT_DIR)))
+
+    def contracts_failed(self, error):
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Contracts Failed", f"Contracts could not be rendered:\n{error}")
+
     # --- Copy available cars to clipboard ---
     def clipboard_avail_cars(self):
         if not self.db or not self.db.isOpen():
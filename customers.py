@@ -0,0 +1,700 @@
+import csv
+import hashlib
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import date
+
+from PySide6.QtSql import QSqlQuery
+
+
+DEFAULT_COUNTRY_CODE = "995"  # Georgia - local numbers in clients.tsv are 9 digits starting with 5
+
+CREATE_CUSTOMERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS customers
+    (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        name_key TEXT NOT NULL,
+        phone TEXT NOT NULL DEFAULT '',
+        rental_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (name_key, phone)
+    )
+"""
+
+# Spend is kept per currency instead of summing GEL, $ and EUR into one number
+CREATE_CUSTOMER_TOTALS_TABLE = """
+    CREATE TABLE IF NOT EXISTS customer_totals
+    (
+        customer_id INTEGER NOT NULL REFERENCES customers (id),
+        currency TEXT NOT NULL,
+        total_spend REAL DEFAULT 0.0,
+        PRIMARY KEY (customer_id, currency)
+    )
+"""
+
+# Rentals imported from clients.tsv, one row per source line (source_key keeps re-imports from doubling up,
+# source_hash lets unchanged lines be skipped)
+CREATE_CUSTOMER_RENTALS_TABLE = """
+    CREATE TABLE IF NOT EXISTS customer_rentals
+    (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_key TEXT UNIQUE NOT NULL,
+        source_hash TEXT,
+        customer_id INTEGER NOT NULL REFERENCES customers (id),
+        car TEXT,
+        registration TEXT,
+        date_taken TEXT,
+        date_return TEXT,
+        taken_on TEXT,
+        return_on TEXT,
+        status TEXT
+    )
+"""
+
+# One row per amount, so "500SAU +100$" becomes 500 SAR and 100 USD
+CREATE_CUSTOMER_RENTAL_AMOUNTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS customer_rental_amounts
+    (
+        customer_rental_id INTEGER NOT NULL REFERENCES customer_rentals (id),
+        kind TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        amount REAL NOT NULL
+    )
+"""
+
+# columns added after the first release of each table
+ADDED_COLUMNS = (
+    ("rentals", "customer_id", "INTEGER REFERENCES customers (id)"),
+    ("customer_rentals", "source_hash", "TEXT"),
+    ("customer_rentals", "taken_on", "TEXT"),
+    ("customer_rentals", "return_on", "TEXT"),
+)
+
+# marker found in the typed amount -> currency code
+CURRENCY_MARKERS = (
+    ("$", "USD"), ("USD", "USD"),
+    ("GEL", "GEL"), ("LARI", "GEL"),
+    ("EUR", "EUR"), ("EVR", "EUR"), ("€", "EUR"),
+    ("RUB", "RUB"),
+    ("DIRHAM", "AED"),
+    ("SAU", "SAR"), ("RIYAL", "SAR"),
+    ("CND", "CAD"), ("CAD", "CAD"),
+)
+
+
+# --- Normalization helpers ---
+def normalize_name(raw):
+    # "Pletin  Vladislan" / "VLADISLAN PLETIN" -> "PLETIN VLADISLAN" (tokens sorted so word order doesn't matter)
+    text = unicodedata.normalize("NFKD", raw or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    tokens = re.sub(r"[^A-Z]+", " ", text.upper()).split()
+    return " ".join(sorted(tokens))
+
+
+def normalize_phone(raw, country_code=DEFAULT_COUNTRY_CODE):
+    # Several numbers are sometimes typed in one cell ("971543841986/447917683084", "306943046843--306949599407",
+    # "555365834,, 558166758"), keep the first one
+    first = re.split(r"[/,;(]|-{2,}|\s{2,}", raw or "")[0]
+    digits = re.sub(r"\D", "", first)
+    if digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = digits[1:]  # local trunk prefix, "0548013001" -> "548013001"
+    if len(digits) == 9 and digits.startswith("5"):
+        digits = country_code + digits
+    # E.164 allows at most 15 digits
+    if not 10 <= len(digits) <= 15:
+        return ""
+    return f"+{digits}"
+
+
+def parse_amount(raw):
+    # "200$ CARD", "550GEL", "1\xa0000GEL" -> 200.0, 550.0, 1000.0; None when there is no number
+    text = re.sub(r"(?<=\d)[\s\u00a0'’,.](?=\d{3}(?!\d))", "", raw or "")
+    match = re.search(r"\d+(?:[.,]\d+)?", text)
+    if not match:
+        return None
+    return float(match.group(0).replace(",", "."))
+
+
+def parse_money(raw):
+    # "200$ CARD" -> [(200.0, "USD")], "500SAU +100$" -> [(500.0, "SAR"), (100.0, "USD")], "" -> []
+    # currency is "" when none was typed; None when the cell can't be read ("Fu", two currencies on one amount)
+    text = (raw or "").upper().strip()
+    if not text:
+        return []
+    amounts = []
+    for part in text.split("+"):
+        amount = parse_amount(part)
+        codes = {code for marker, code in CURRENCY_MARKERS if marker in part}
+        if amount is None or len(codes) > 1:
+            return None
+        amounts.append((amount, codes.pop() if codes else ""))
+    return amounts
+
+
+def parse_day_month(raw):
+    # "01.08", "04:08" -> (1, 8)
+    match = re.fullmatch(r"\s*(\d{1,2})[.:/](\d{1,2})\s*", raw or "")
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def infer_rental_dates(date_taken, date_return, today=None):
+    # clients.tsv dates have no year: the handover is the latest such day not after today,
+    # the return the first such day not before the handover
+    today = today or date.today()
+    taken = parse_day_month(date_taken)
+    returned = parse_day_month(date_return)
+    if not taken or not returned:
+        return None, None
+    try:
+        taken_on = date(today.year, taken[1], taken[0])
+        if taken_on > today:
+            taken_on = date(today.year - 1, taken[1], taken[0])
+        return_on = date(taken_on.year, returned[1], returned[0])
+        if return_on < taken_on:
+            return_on = date(taken_on.year + 1, returned[1], returned[0])
+    except ValueError:
+        return None, None
+    return taken_on.isoformat(), return_on.isoformat()
+
+
+def normalize_registration(raw):
+    # clients.tsv has "MM-507-MC", cars.registration has "MM507MC"
+    return re.sub(r"[^A-Z0-9]", "", (raw or "").upper())
+
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+
+def soundex(token):
+    if not token:
+        return ""
+    token = token.upper()
+    code = token[0]
+    last = _SOUNDEX_CODES.get(token[0], "")
+    for ch in token[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "HW":
+            last = digit
+    return code.ljust(4, "0")
+
+
+# --- Schema ---
+def ensure_customer_schema(db):
+    query = QSqlQuery(db)
+    for create in (
+        CREATE_CUSTOMERS_TABLE,
+        CREATE_CUSTOMER_TOTALS_TABLE,
+        CREATE_CUSTOMER_RENTALS_TABLE,
+        CREATE_CUSTOMER_RENTAL_AMOUNTS_TABLE,
+    ):
+        if not query.exec(create):
+            print("Could not create customer tables:", query.lastError().text())
+            return False
+
+    # rentals only carry a free text customer_name, customer_id links them to the registry
+    for table, column, definition in ADDED_COLUMNS:
+        columns = []
+        query.exec(f"PRAGMA table_info({table})")
+        while query.next():
+            columns.append(query.value(1))
+        if column not in columns and not query.exec(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"):
+            print(f"Could not add {table}.{column}:", query.lastError().text())
+            return False
+
+    query.exec("CREATE INDEX IF NOT EXISTS idx_customers_name_key ON customers (name_key)")
+    query.exec("CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers (phone)")
+    query.exec("CREATE INDEX IF NOT EXISTS idx_rentals_customer_id ON rentals (customer_id)")
+    query.exec("CREATE INDEX IF NOT EXISTS idx_customer_rentals_customer_id ON customer_rentals (customer_id)")
+    query.exec(
+        "CREATE INDEX IF NOT EXISTS idx_customer_rental_amounts_rental ON customer_rental_amounts (customer_rental_id)"
+    )
+    return True
+
+
+# --- In-memory lookup index ---
+class CustomerIndex:
+    def __init__(self):
+        self.customers = {}  # id -> customer dict
+        self._name_keys = []  # sorted (name token, id)
+        self._phone_keys = []  # sorted (phone digits, id)
+        self._phonetic_keys = {}  # soundex -> set of ids
+
+    def load(self, db):
+        self.customers.clear()
+        self._name_keys.clear()
+        self._phone_keys.clear()
+        self._phonetic_keys.clear()
+
+        query = QSqlQuery(db)
+        if not query.exec(
+            """
+            SELECT id, name, name_key, phone, rental_count
+            FROM customers
+            """
+        ):
+            print("Customer load failed:", query.lastError().text())
+            return
+        names = []
+        phones = []
+        while query.next():
+            customer = self._row_to_customer(query)
+            self.customers[customer["id"]] = customer
+            names.extend((token, customer["id"]) for token in customer["name_key"].split())
+            if customer["phone"]:
+                phones.append((customer["phone"][1:], customer["id"]))
+            for token in customer["name_key"].split():
+                self._phonetic_keys.setdefault(soundex(token), set()).add(customer["id"])
+        # one sort on load, inserts afterwards keep the lists sorted
+        self._name_keys = sorted(names)
+        self._phone_keys = sorted(phones)
+
+        if query.exec("SELECT customer_id, currency, total_spend FROM customer_totals"):
+            while query.next():
+                customer = self.customers.get(query.value(0))
+                if customer is not None:
+                    customer["totals"][query.value(1)] = query.value(2) or 0.0
+
+    def refresh(self, db, customer_ids):
+        # pick up counts and totals recomputed in the database, only for the given customers
+        query = QSqlQuery(db)
+        for customer_id in customer_ids:
+            customer = self.customers.get(customer_id)
+            if customer is None:
+                continue
+            query.prepare("SELECT rental_count FROM customers WHERE id = ?")
+            query.addBindValue(customer_id)
+            if query.exec() and query.next():
+                customer["rental_count"] = query.value(0) or 0
+            query.prepare("SELECT currency, total_spend FROM customer_totals WHERE customer_id = ?")
+            query.addBindValue(customer_id)
+            customer["totals"] = {}
+            if query.exec():
+                while query.next():
+                    customer["totals"][query.value(0)] = query.value(1) or 0.0
+
+    @staticmethod
+    def _row_to_customer(query):
+        return {
+            "id": query.value(0),
+            "name": query.value(1),
+            "name_key": query.value(2),
+            "phone": query.value(3) or "",
+            "rental_count": query.value(4) or 0,
+            "totals": {},  # currency -> total spend
+        }
+
+    def _add(self, customer):
+        self.customers[customer["id"]] = customer
+        for token in customer["name_key"].split():
+            insort(self._name_keys, (token, customer["id"]))
+            self._phonetic_keys.setdefault(soundex(token), set()).add(customer["id"])
+        if customer["phone"]:
+            insort(self._phone_keys, (customer["phone"][1:], customer["id"]))
+
+    @staticmethod
+    def _prefix_ids(keys, prefix):
+        ids = []
+        i = bisect_left(keys, (prefix,))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            ids.append(keys[i][1])
+            i += 1
+        return ids
+
+    def lookup(self, text, limit=20):
+        text = (text or "").strip()
+        if not text:
+            return []
+
+        if re.fullmatch(r"[\d\s+()-]+", text):
+            # typed a phone number - match full international digits or the local part
+            digits = re.sub(r"\D", "", text).lstrip("0")
+            matched = set(self._prefix_ids(self._phone_keys, digits))
+            matched.update(self._prefix_ids(self._phone_keys, DEFAULT_COUNTRY_CODE + digits))
+        else:
+            # every typed word must prefix some token of the name, in any order
+            tokens = normalize_name(text).split()
+            if not tokens:
+                return []
+            matched = set.intersection(*(set(self._prefix_ids(self._name_keys, token)) for token in tokens))
+            # nothing spelled that way - fall back to "sounds like" (VLADISLAN / VLADISLAV)
+            if not matched and all(len(token) >= 3 for token in tokens):
+                matched = set.intersection(*(self._phonetic_keys.get(soundex(token), set()) for token in tokens))
+
+        results = [self.customers[customer_id] for customer_id in matched]
+        results.sort(key=lambda c: (-c["rental_count"], c["name"]))
+        return results[:limit]
+
+    def find(self, name, phone=""):
+        name_key = normalize_name(name)
+        phone = normalize_phone(phone)
+        if phone:
+            for customer_id in self._prefix_ids(self._phone_keys, phone[1:]):
+                customer = self.customers[customer_id]
+                if customer["phone"] == phone:
+                    return customer
+        if not name_key:
+            return None
+        for customer_id in self._prefix_ids(self._name_keys, name_key.split()[0]):
+            customer = self.customers[customer_id]
+            if customer["name_key"] == name_key and (not phone or not customer["phone"]):
+                return customer
+        return None
+
+    # --- Registry maintenance ---
+    def get_or_create(self, db, name, phone=""):
+        customer = self.find(name, phone)
+        phone = normalize_phone(phone)
+        if customer is not None:
+            # phone learned on a later rental
+            if not customer["phone"] and phone:
+                self._set_phone(db, customer, phone)
+            return customer
+
+        name_key = normalize_name(name)
+        if not name_key:
+            return None
+        display_name = " ".join(name.upper().split())
+        query = QSqlQuery(db)
+        query.prepare("INSERT INTO customers (name, name_key, phone) VALUES (?, ?, ?)")
+        query.addBindValue(display_name)
+        query.addBindValue(name_key)
+        query.addBindValue(phone)
+        if not query.exec():
+            print(f"Insert failed for {name}: {query.lastError().text()}")
+            return None
+        customer = {
+            "id": query.lastInsertId(),
+            "name": display_name,
+            "name_key": name_key,
+            "phone": phone,
+            "rental_count": 0,
+            "totals": {},
+        }
+        self._add(customer)
+        return customer
+
+    def _set_phone(self, db, customer, phone):
+        query = QSqlQuery(db)
+        query.prepare("UPDATE customers SET phone = ? WHERE id = ?")
+        query.addBindValue(phone)
+        query.addBindValue(customer["id"])
+        if query.exec():
+            customer["phone"] = phone
+            insort(self._phone_keys, (phone[1:], customer["id"]))
+
+    def link_rental(self, db, rental_id, name, phone=""):
+        # call whenever a row is added to rentals, the count is updated incrementally
+        customer = self.get_or_create(db, name, phone)
+        if customer is None:
+            return None
+        query = QSqlQuery(db)
+        query.prepare("UPDATE rentals SET customer_id = ? WHERE id = ? AND customer_id IS NULL")
+        query.addBindValue(customer["id"])
+        query.addBindValue(rental_id)
+        if not query.exec():
+            print(f"Linking rental {rental_id} failed: {query.lastError().text()}")
+            return None
+        if query.numRowsAffected() > 0:
+            query.prepare("UPDATE customers SET rental_count = rental_count + 1 WHERE id = ?")
+            query.addBindValue(customer["id"])
+            if not query.exec():
+                print(f"Update failed for {customer['id']}: {query.lastError().text()}")
+                return None
+            customer["rental_count"] += 1
+        return customer
+
+
+# --- Linking rentals to customers ---
+def link_rentals(db, index):
+    # backfill rentals typed before the registry existed
+    query = QSqlQuery(db)
+    if not query.exec("SELECT id, customer_name FROM rentals WHERE customer_id IS NULL"):
+        print("Rentals query failed:", query.lastError().text())
+        return 0
+    unlinked = []
+    while query.next():
+        unlinked.append((query.value(0), query.value(1)))
+    if not unlinked:
+        return 0
+
+    db.transaction()
+    for rental_id, name in unlinked:
+        if index.link_rental(db, rental_id, name or "") is None and normalize_name(name):
+            db.rollback()
+            index.load(db)
+            return 0
+    db.commit()
+    return len(unlinked)
+
+
+def refresh_aggregates(db, customer_ids):
+    # recompute count and per-currency spend for the given customers only, everyone else is untouched
+    query = QSqlQuery(db)
+    for customer_id in customer_ids:
+        statements = (
+            (
+                """
+                UPDATE customers
+                SET rental_count = (SELECT COUNT(*) FROM customer_rentals WHERE customer_id = ?)
+                                 + (SELECT COUNT(*) FROM rentals WHERE customer_id = ?)
+                WHERE id = ?
+                """,
+                3,
+            ),
+            ("DELETE FROM customer_totals WHERE customer_id = ?", 1),
+            (
+                """
+                INSERT INTO customer_totals (customer_id, currency, total_spend)
+                SELECT cr.customer_id, a.currency, SUM(a.amount)
+                FROM customer_rental_amounts a
+                JOIN customer_rentals cr ON cr.id = a.customer_rental_id
+                WHERE cr.customer_id = ? AND a.kind = 'spend'
+                GROUP BY a.currency
+                HAVING SUM(a.amount) <> 0
+                """,
+                1,
+            ),
+        )
+        for statement, binds in statements:
+            query.prepare(statement)
+            for _ in range(binds):
+                query.addBindValue(customer_id)
+            if not query.exec():
+                print(f"Aggregate refresh failed for {customer_id}: {query.lastError().text()}")
+                return False
+    return True
+
+
+def outstanding_deposits(db, customer_id):
+    # a deposit is still held while the imported rental's return date hasn't passed
+    deposits = {}
+    query = QSqlQuery(db)
+    query.prepare(
+        """
+        SELECT a.currency, SUM(a.amount)
+        FROM customer_rental_amounts a
+        JOIN customer_rentals cr ON cr.id = a.customer_rental_id
+        WHERE cr.customer_id = ? AND a.kind = 'deposit' AND cr.return_on >= date('now', 'localtime')
+        GROUP BY a.currency
+        HAVING SUM(a.amount) <> 0
+        """
+    )
+    query.addBindValue(customer_id)
+    if not query.exec():
+        print("Deposit query failed:", query.lastError().text())
+        return deposits
+    while query.next():
+        deposits[query.value(0)] = query.value(1)
+    return deposits
+
+
+# --- Rental history ---
+def customer_history(db, customer_id):
+    history = []
+    query = QSqlQuery(db)
+    query.prepare(
+        """
+        SELECT r.rental_date, r.return_date, r.car_code, c.make, c.model, r.is_returned
+        FROM rentals r
+        LEFT JOIN cars c ON c.car_code = r.car_code
+        WHERE r.customer_id = ?
+        ORDER BY r.rental_date DESC
+        """
+    )
+    query.addBindValue(customer_id)
+    if not query.exec():
+        print("History query failed:", query.lastError().text())
+        return history
+    while query.next():
+        history.append({
+            "rental_date": query.value(0),
+            "return_date": query.value(1),
+            "car_code": query.value(2),
+            "car": f"{query.value(3) or ''} {query.value(4) or ''}".strip(),
+            "status": "returned" if query.value(5) else "out",
+        })
+
+    # clients.tsv dates have no year, keep them in file order (newest last) after the app's rentals
+    query.prepare(
+        """
+        SELECT date_taken, date_return, registration, car, status
+        FROM customer_rentals
+        WHERE customer_id = ?
+        ORDER BY id DESC
+        """
+    )
+    query.addBindValue(customer_id)
+    if not query.exec():
+        print("History query failed:", query.lastError().text())
+        return history
+    while query.next():
+        history.append({
+            "rental_date": query.value(0),
+            "return_date": query.value(1),
+            "car_code": query.value(2),
+            "car": query.value(3) or "",
+            "status": (query.value(4) or "").lower(),
+        })
+    return history
+
+
+# --- clients.tsv import ---
+def _read_tsv_row(line, row):
+    # parse one clients.tsv line, anything that can't be read is reported instead of stored as 0
+    problems = []
+    name = row["Customer_Name"].strip()
+    registration = normalize_registration(row.get("Reg#"))
+    date_taken = (row.get("Date_Taken") or "").strip()
+    date_return = (row.get("Date_Return") or "").strip()
+    taken_on, return_on = infer_rental_dates(date_taken, date_return)
+    if taken_on is None:
+        problems.append(f"line {line} ({name}): dates {date_taken!r} - {date_return!r} could not be read")
+
+    phone = (row.get("Phone_Number") or "").strip()
+    if phone and not normalize_phone(phone):
+        problems.append(f"line {line} ({name}): phone {phone!r} is not a usable number")
+
+    amounts = []
+    for kind, column in (("spend", "Subtotal"), ("deposit", "Deposit")):
+        parsed = parse_money(row.get(column))
+        if parsed is None:
+            problems.append(f"line {line} ({name}): {column} {row.get(column)!r} could not be read, skipped")
+            continue
+        amounts.extend((kind, currency, amount) for amount, currency in parsed)
+
+    raw = "\t".join(str(value or "") for value in row.values())
+    return {
+        "source_key": (row.get("Unique_ID") or "").strip() or f"{date_taken}|{registration}|{normalize_name(name)}",
+        "source_hash": hashlib.sha1(raw.encode("utf-8")).hexdigest(),
+        "name": name,
+        "phone": phone,
+        "car": (row.get("Model") or "").strip(),
+        "registration": registration,
+        "date_taken": date_taken,
+        "date_return": date_return,
+        "taken_on": taken_on,
+        "return_on": return_on,
+        "status": (row.get("Status") or "").strip().upper(),
+        "amounts": amounts,
+    }, problems
+
+
+def import_clients_tsv(db, index, tsv_file):
+    # returns (lines imported or changed, problems), or None if nothing could be imported
+    # read the whole file before touching the database, a missing file leaves nothing half-done
+    try:
+        with open(tsv_file, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f, delimiter="\t"))
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Could not read {tsv_file}: {e}")
+        return None
+
+    lookup = QSqlQuery(db)
+    lookup.prepare("SELECT id, customer_id, source_hash FROM customer_rentals WHERE source_key = ?")
+    insert = QSqlQuery(db)
+    insert.prepare(
+        """
+        INSERT INTO customer_rentals
+            (source_hash, customer_id, car, registration, date_taken, date_return, taken_on, return_on, status,
+             source_key)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+    )
+    update = QSqlQuery(db)
+    update.prepare(
+        """
+        UPDATE customer_rentals
+        SET source_hash = ?, customer_id = ?, car = ?, registration = ?, date_taken = ?, date_return = ?,
+            taken_on = ?, return_on = ?, status = ?
+        WHERE id = ?
+        """
+    )
+    clear_amounts = QSqlQuery(db)
+    clear_amounts.prepare("DELETE FROM customer_rental_amounts WHERE customer_rental_id = ?")
+    add_amount = QSqlQuery(db)
+    add_amount.prepare(
+        "INSERT INTO customer_rental_amounts (customer_rental_id, kind, currency, amount) VALUES (?, ?, ?, ?)"
+    )
+
+    changed = 0
+    problems = []
+    touched = set()  # customers whose aggregates need recomputing
+    ok = True
+    db.transaction()
+    for line, row in enumerate(rows, start=2):
+        if not (row.get("Customer_Name") or "").strip():
+            continue
+        record, row_problems = _read_tsv_row(line, row)
+        problems.extend(row_problems)
+
+        lookup.addBindValue(record["source_key"])
+        if not lookup.exec():
+            ok = False
+            break
+        existing = (lookup.value(0), lookup.value(1), lookup.value(2)) if lookup.next() else None
+        if existing and existing[2] == record["source_hash"]:
+            continue  # line unchanged since the last import
+
+        customer = index.get_or_create(db, record["name"], record["phone"])
+        if customer is None:
+            ok = False
+            break
+        values = (
+            record["source_hash"], customer["id"], record["car"], record["registration"], record["date_taken"],
+            record["date_return"], record["taken_on"], record["return_on"], record["status"],
+        )
+        statement = update if existing else insert
+        for value in values:
+            statement.addBindValue(value)
+        statement.addBindValue(existing[0] if existing else record["source_key"])
+        if not statement.exec():
+            print(f"Import failed for {record['name']}: {statement.lastError().text()}")
+            ok = False
+            break
+
+        if existing:
+            rental_id = existing[0]
+            touched.add(existing[1])
+            clear_amounts.addBindValue(rental_id)
+            if not clear_amounts.exec():
+                ok = False
+                break
+        else:
+            rental_id = insert.lastInsertId()
+        for kind, currency, amount in record["amounts"]:
+            for value in (rental_id, kind, currency, amount):
+                add_amount.addBindValue(value)
+            if not add_amount.exec():
+                print(f"Import failed for {record['name']}: {add_amount.lastError().text()}")
+                ok = False
+                break
+        if not ok:
+            break
+        touched.add(customer["id"])
+        changed += 1
+
+    if ok and refresh_aggregates(db, touched) and db.commit():
+        index.refresh(db, touched)
+        for problem in problems:
+            print(problem)
+        return changed, problems
+
+    # drop whatever this run added, in the database and in memory
+    db.rollback()
+    index.load(db)
+    return None
@@ -0,0 +1,269 @@
+import argparse
+import csv
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from string import Template
+
+from PySide6.QtGui import QGuiApplication, QPageSize, QPdfWriter, QTextDocument
+from PySide6.QtSql import QSqlDatabase, QSqlQuery
+
+from customers import normalize_registration
+
+
+DEFAULT_OUTPUT_DIR = "documents"
+CACHE_INDEX = ".render_cache.json"
+POOL_THRESHOLD = 8  # below this many documents a worker pool costs more than it saves
+
+_worker_app = None
+
+DOCUMENT_FIELDS = (
+    "customer_name", "phone", "make", "model", "year", "registration", "route",
+    "date_taken", "date_return", "time", "total_days", "per_day_price", "deposit", "subtotal", "renter", "notes",
+)
+
+_DETAILS = """
+    <table width="100%" cellspacing="0" cellpadding="4" border="1">
+        <tr><td width="30%"><b>Customer</b></td><td>$customer_name</td></tr>
+        <tr><td><b>Phone</b></td><td>$phone</td></tr>
+        <tr><td><b>Car</b></td><td>$year $make $model</td></tr>
+        <tr><td><b>Registration</b></td><td>$registration</td></tr>
+        <tr><td><b>Route</b></td><td>$route</td></tr>
+        <tr><td><b>Taken / Returned</b></td><td>$date_taken - $date_return ($time)</td></tr>
+        <tr><td><b>Days x Price</b></td><td>$total_days x $per_day_price</td></tr>
+        <tr><td><b>Deposit</b></td><td>$deposit</td></tr>
+        <tr><td><b>Subtotal</b></td><td>$subtotal</td></tr>
+        <tr><td><b>Renter</b></td><td>$renter</td></tr>
+        <tr><td><b>Notes</b></td><td>$notes</td></tr>
+    </table>
+"""
+
+# Templates are compiled once at import, rendering is only a substitution
+TEMPLATES = {
+    "contract": Template(
+        """
+        <h2>Global Car Rental - Rental Contract</h2>
+        <p>No. $document_id</p>
+        """ + _DETAILS + """
+        <p>The customer receives the car above in good condition and returns it on the date and time agreed,
+        with the same fuel level. The deposit is returned after the car is checked.</p>
+        <br><br>
+        <table width="100%"><tr>
+            <td>Customer signature: ____________________</td>
+            <td align="right">Renter signature: ____________________</td>
+        </tr></table>
+        """
+    ),
+    "receipt": Template(
+        """
+        <h2>Global Car Rental - Receipt</h2>
+        <p>No. $document_id</p>
+        """ + _DETAILS + """
+        <br>
+        <p>Received with thanks.</p>
+        """
+    ),
+}
+
+
+# --- Loading records ---
+def load_rentals_for_day(db, day):
+    # rentals only stores dates and the customer, everything else comes from the car
+    query = QSqlQuery(db)
+    query.prepare(
+        """
+        SELECT r.id, r.customer_name, r.rental_date, r.return_date,
+               c.make, c.model, c.year, c.registration, c.daily_rate
+        FROM rentals r
+        JOIN cars c ON c.car_code = r.car_code
+        WHERE date(r.rental_date) = ?
+        ORDER BY r.rental_date
+        """
+    )
+    query.addBindValue(day)
+    records = []
+    if not query.exec():
+        print("Rentals query failed:", query.lastError().text())
+        return records
+    while query.next():
+        records.append({
+            "document_id": str(query.value(0)),
+            "customer_name": query.value(1),
+            "date_taken": query.value(2),
+            "date_return": query.value(3),
+            "make": query.value(4),
+            "model": query.value(5),
+            "year": query.value(6),
+            "registration": query.value(7),
+            "per_day_price": query.value(8),
+        })
+    return records
+
+
+def load_cars_by_registration(db):
+    # keyed without dashes/spaces, clients.tsv types "MM-507-MC" where cars has "MM507MC"
+    cars = {}
+    query = QSqlQuery(db)
+    if query.exec("SELECT registration, make, model, year FROM cars"):
+        while query.next():
+            cars[normalize_registration(query.value(0))] = (query.value(1), query.value(2), query.value(3))
+    return cars
+
+
+def load_clients_tsv(db, tsv_file, day=None):
+    # day is "dd.mm" as typed in clients.tsv
+    cars = load_cars_by_registration(db)
+    records = []
+    with open(tsv_file, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            if not (row.get("Customer_Name") or "").strip():
+                continue
+            if day and (row.get("Date_Taken") or "").strip() != day:
+                continue
+            registration = (row.get("Reg#") or "").strip()
+            make, model, year = cars.get(normalize_registration(registration), ("", row.get("Model"), ""))
+            customer_name = row["Customer_Name"].strip()
+            # most rows have no Unique_ID yet, fall back to something stable from the row itself
+            document_id = row.get("Unique_ID") or f"{row['Date_Taken']}-{registration}-{customer_name}"
+            records.append({
+                "document_id": document_id,
+                "customer_name": customer_name,
+                "phone": row.get("Phone_Number"),
+                "make": make,
+                "model": model,
+                "year": year,
+                "registration": registration,
+                "route": row.get("Route"),
+                "date_taken": row.get("Date_Taken"),
+                "date_return": row.get("Date_Return"),
+                "time": row.get("Time"),
+                "total_days": row.get("Total_Days"),
+                "per_day_price": row.get("Per_Day_Price"),
+                "deposit": row.get("Deposit"),
+                "subtotal": row.get("Subtotal"),
+                "renter": row.get("Renter"),
+                "notes": row.get("Notes"),
+            })
+    return records
+
+
+# --- Rendering ---
+def render_html(kind, record):
+    values = {field: html.escape(str(record.get(field) or "")) for field in DOCUMENT_FIELDS}
+    values["document_id"] = html.escape(str(record.get("document_id") or ""))
+    return TEMPLATES[kind].substitute(values)
+
+
+def write_pdf(html_text, pdf_file):
+    writer = QPdfWriter(pdf_file)
+    writer.setPageSize(QPageSize(QPageSize.PageSizeId.A4))
+    writer.setResolution(300)
+    document = QTextDocument()
+    document.setHtml(html_text)
+    document.print_(writer)
+    return pdf_file
+
+
+def document_filename(kind, document_id):
+    # ids end up in a path, keep only word characters and dashes so nothing can escape output_dir;
+    # a short hash of the raw id keeps "A/1" and "A-1" from landing on the same file
+    raw_id = str(document_id)
+    safe_id = re.sub(r"[^\w-]+", "-", raw_id).strip("-")
+    return f"{kind}_{safe_id}_{hashlib.sha1(raw_id.encode('utf-8')).hexdigest()[:8]}.pdf"
+
+
+def _init_worker():
+    # QTextDocument needs a GUI application for fonts, workers have no screen
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    global _worker_app
+    _worker_app = QGuiApplication.instance() or QGuiApplication([])
+
+
+def _render_one(job):
+    return write_pdf(*job)
+
+
+def _load_cache_index(output_dir):
+    try:
+        with open(os.path.join(output_dir, CACHE_INDEX), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache_index(output_dir, index):
+    with open(os.path.join(output_dir, CACHE_INDEX), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+
+
+def generate_documents(records, kind="contract", output_dir=DEFAULT_OUTPUT_DIR, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    index = _load_cache_index(output_dir)
+
+    # the hash covers the template too, so editing a template re-renders everything
+    pending = []
+    skipped = 0
+    seen = set()
+    for record in records:
+        pdf_file = os.path.join(output_dir, document_filename(kind, record["document_id"]))
+        # two records with the same id would overwrite each other's PDF, possibly from two workers at once
+        if pdf_file in seen:
+            raise ValueError(f"Duplicate document id {record['document_id']!r}, nothing was rendered")
+        seen.add(pdf_file)
+
+        html_text = render_html(kind, record)
+        digest = hashlib.sha256(f"{kind}\n{html_text}".encode("utf-8")).hexdigest()
+        if index.get(os.path.basename(pdf_file)) == digest and os.path.exists(pdf_file):
+            skipped += 1
+            continue
+        pending.append((html_text, pdf_file, digest))
+
+    jobs = [(html_text, pdf_file) for html_text, pdf_file, _ in pending]
+    if len(jobs) < POOL_THRESHOLD:
+        if QGuiApplication.instance() is None:
+            _init_worker()
+        for job in jobs:
+            _render_one(job)
+    else:
+        # spawned workers build their own offscreen app, forked ones would inherit the GUI's display connection
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker
+        ) as pool:
+            # chunksize keeps the per-document IPC overhead small
+            list(pool.map(_render_one, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count())))))
+
+    for _, pdf_file, digest in pending:
+        index[os.path.basename(pdf_file)] = digest
+    _save_cache_index(output_dir, index)
+    return len(pending), skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render rental contracts / receipts to PDF.")
+    parser.add_argument("--kind", choices=sorted(TEMPLATES), default="contract")
+    parser.add_argument("--day", help="YYYY-MM-DD for rentals, dd.mm for clients.tsv (default: today)")
+    parser.add_argument("--tsv", help="read rentals from a clients.tsv export instead of the database")
+    parser.add_argument("--db", default="car_rental.db")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    _init_worker()
+    db = QSqlDatabase.addDatabase("QSQLITE")
+    db.setDatabaseName(args.db)
+    if not db.open():
+        print("Could not connect:", db.lastError().text())
+        sys.exit(1)
+
+    if args.tsv:
+        records = load_clients_tsv(db, args.tsv, args.day)
+    else:
+        records = load_rentals_for_day(db, args.day or date.today().isoformat())
+    rendered, skipped = generate_documents(records, args.kind, args.out, args.workers)
+    print(f"🎉 {rendered} {args.kind}s rendered, {skipped} unchanged, in {args.out}/")
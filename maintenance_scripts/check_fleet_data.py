@@ -0,0 +1,39 @@
+from PySide6.QtSql import QSqlQuery
+
+
+NAME = "check_fleet_data"
+READ_ONLY = True
+CHUNK_SIZE = 1000
+
+REQUIRED_FIELDS = ("registration", "vin", "tech_passport")
+
+
+def select_chunk(db, after_id, limit):
+    query = QSqlQuery(db)
+    query.prepare(
+        """
+        SELECT id, car_code, registration, vin, tech_passport
+        FROM cars
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
+        """
+    )
+    query.addBindValue(after_id)
+    query.addBindValue(limit)
+    if not query.exec():
+        print("Select failed:", query.lastError().text())
+        return None
+
+    rows = []
+    while query.next():
+        rows.append((query.value(0), query.value(1), query.value(2), query.value(3), query.value(4)))
+    return rows
+
+
+def process_rows(db, rows):
+    for car_id, car_code, *values in rows:
+        missing = [field for field, value in zip(REQUIRED_FIELDS, values) if not value]
+        if missing:
+            print(f"⚠️ {car_code} (id {car_id}) is missing: {', '.join(missing)}")
+    return True
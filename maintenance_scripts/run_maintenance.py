@@ -0,0 +1,208 @@
+import argparse
+import importlib
+import multiprocessing
+import os
+import pkgutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtSql import QSqlDatabase, QSqlQuery
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(SCRIPTS_DIR, "..", "car_rental.db")
+DEFAULT_CHUNK_SIZE = 500
+
+_app = None
+
+# A job module defines:
+#   NAME                                   - unique job name, used as checkpoint key
+#   READ_ONLY = True/False                 - read-only jobs run in parallel worker processes, without checkpoints
+#   CHUNK_SIZE (optional)                  - rows per checkpointed chunk
+#   select_chunk(db, after_id, limit)      - next rows ordered by id, each row starts with its id (None on error)
+#   process_rows(db, rows) -> bool         - handle one chunk, False aborts the run
+CREATE_CHECKPOINTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS maintenance_checkpoints
+    (
+        job TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL,
+        rows_done INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+# --- Qt setup (QSqlDatabase needs an application object, in every process) ---
+def init_qt():
+    global _app
+    _app = QCoreApplication.instance() or QCoreApplication([])
+
+
+# --- Database connection (one named connection per job) ---
+def connect_to_sqlite_db(db_file, connection_name, read_only=False):
+    db = QSqlDatabase.addDatabase("QSQLITE", connection_name)
+    db.setDatabaseName(db_file)
+    # parallel jobs share the file, wait for a lock instead of failing straight away
+    options = "QSQLITE_BUSY_TIMEOUT=10000"
+    if read_only:
+        options += ";QSQLITE_OPEN_READONLY"
+    db.setConnectOptions(options)
+    if not db.open():
+        print(f"[{connection_name}] Could not connect:", db.lastError().text())
+        return None
+    return db
+
+
+# --- Job discovery ---
+def discover_jobs():
+    jobs = {}
+    for module_info in pkgutil.iter_modules([SCRIPTS_DIR]):
+        if module_info.name == "run_maintenance":
+            continue
+        module = importlib.import_module(module_info.name)
+        if hasattr(module, "NAME") and hasattr(module, "select_chunk") and hasattr(module, "process_rows"):
+            jobs[module.NAME] = module_info.name
+    return jobs
+
+
+# --- Checkpoints ---
+def load_checkpoint(db, job_name):
+    query = QSqlQuery(db)
+    query.prepare("SELECT last_id, rows_done FROM maintenance_checkpoints WHERE job = ?")
+    query.addBindValue(job_name)
+    if query.exec() and query.next():
+        return query.value(0), query.value(1)
+    return 0, 0
+
+
+def save_checkpoint(db, job_name, last_id, rows_done):
+    query = QSqlQuery(db)
+    query.prepare("INSERT OR REPLACE INTO maintenance_checkpoints (job, last_id, rows_done) VALUES (?, ?, ?)")
+    query.addBindValue(job_name)
+    query.addBindValue(last_id)
+    query.addBindValue(rows_done)
+    return query.exec()
+
+
+def clear_checkpoint(db, job_name):
+    query = QSqlQuery(db)
+    query.prepare("DELETE FROM maintenance_checkpoints WHERE job = ?")
+    query.addBindValue(job_name)
+    query.exec()
+
+
+# --- Running a single job ---
+def run_job(module_name, db_file, restart=False):
+    job = importlib.import_module(module_name)
+    # read-only jobs never take the write lock: they skip checkpoints and simply start over if interrupted
+    read_only = getattr(job, "READ_ONLY", False)
+    db = connect_to_sqlite_db(db_file, job.NAME, read_only)
+    if not db:
+        return job.NAME, 0, 0.0, False
+
+    last_id, rows_done = 0, 0
+    if not read_only:
+        QSqlQuery(db).exec(CREATE_CHECKPOINTS_TABLE)
+        if restart:
+            clear_checkpoint(db, job.NAME)
+        last_id, rows_done = load_checkpoint(db, job.NAME)
+        if last_id:
+            print(f"[{job.NAME}] Resuming after id {last_id} ({rows_done} rows already done)")
+
+    chunk_size = getattr(job, "CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    rows_this_run = 0
+    ok = True
+    start = time.perf_counter()
+    while True:
+        rows = job.select_chunk(db, last_id, chunk_size)
+        if rows is None:
+            ok = False
+            break
+        if not rows:
+            break
+
+        if read_only:
+            if not job.process_rows(db, rows):
+                ok = False
+                break
+            last_id = rows[-1][0]
+            rows_this_run += len(rows)
+            continue
+
+        # the chunk and its checkpoint commit together, so a crash never leaves a chunk half-applied
+        db.transaction()
+        if not job.process_rows(db, rows) or not save_checkpoint(db, job.NAME, rows[-1][0], rows_done + len(rows)):
+            db.rollback()
+            print(f"[{job.NAME}] Chunk after id {last_id} failed, rolled back. Re-run to resume.")
+            ok = False
+            break
+        db.commit()
+
+        last_id = rows[-1][0]
+        rows_done += len(rows)
+        rows_this_run += len(rows)
+
+    elapsed = time.perf_counter() - start
+    if ok and not read_only:
+        clear_checkpoint(db, job.NAME)
+    db.close()
+    del db
+    QSqlDatabase.removeDatabase(job.NAME)
+    return job.NAME, rows_this_run, elapsed, ok
+
+
+def report(name, rows, elapsed, ok):
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    status = "✅" if ok else "❌"
+    print(f"{status} {name}: {rows} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+
+
+def run_all(job_modules, db_file, workers, restart=False):
+    read_only = [m for m in job_modules if getattr(importlib.import_module(m), "READ_ONLY", False)]
+    writers = [m for m in job_modules if m not in read_only]
+
+    # read-only jobs run side by side in worker processes while writers run one at a time here
+    # (SQLite allows a single writer)
+    results = []
+    # spawned workers start clean and build their own QCoreApplication instead of inheriting ours
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=init_qt
+    ) as pool:
+        futures = [pool.submit(run_job, m, db_file, restart) for m in read_only]
+        for module_name in writers:
+            result = run_job(module_name, db_file, restart)
+            report(*result)
+            results.append(result)
+        for future in as_completed(futures):
+            result = future.result()
+            report(*result)
+            results.append(result)
+    return all(ok for _, _, _, ok in results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run maintenance jobs against the car rental database.")
+    parser.add_argument("jobs", nargs="*", help="job names to run (default: all)")
+    parser.add_argument("--db", default=DEFAULT_DB, help="path to the sqlite database")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes for read-only jobs")
+    parser.add_argument("--restart", action="store_true", help="ignore saved checkpoints and start over")
+    parser.add_argument("--list", action="store_true", help="list available jobs and exit")
+    args = parser.parse_args()
+
+    init_qt()
+    available = discover_jobs()
+    if args.list:
+        for name in sorted(available):
+            print(name)
+        sys.exit(0)
+
+    unknown = [name for name in args.jobs if name not in available]
+    if unknown:
+        print("Unknown jobs:", ", ".join(unknown))
+        sys.exit(1)
+
+    selected = [available[name] for name in (args.jobs or sorted(available))]
+    print(f"🚗 Running maintenance: {', '.join(args.jobs or sorted(available))}")
+    sys.exit(0 if run_all(selected, os.path.abspath(args.db), args.workers, args.restart) else 1)
@@ -1,26 +1,34 @@
-from PySide6.QtSql import QSqlDatabase, QSqlQuery
+import sys
 
+from PySide6.QtSql import QSqlQuery
 
-def connect_to_sqlite_db(db_file):
-    db = QSqlDatabase.addDatabase("QSQLITE")
-    db.setDatabaseName(db_file)
-    if not db.open():
-        print("Could not connect:", db.lastError().text())
-        return None
-    return db
+from run_maintenance import DEFAULT_DB, init_qt, report, run_job
+
+
+NAME = "update_car_codes"
+READ_ONLY = False
+CHUNK_SIZE = 200
 
 
-def update_car_codes(db):
+def select_chunk(db, after_id, limit):
     query = QSqlQuery(db)
-    if not query.exec("SELECT id, car_code, registration FROM cars"):
+    query.prepare("SELECT id, car_code, registration FROM cars WHERE id > ? ORDER BY id LIMIT ?")
+    query.addBindValue(after_id)
+    query.addBindValue(limit)
+    if not query.exec():
         print("Select failed:", query.lastError().text())
-        return
+        return None
 
+    rows = []
     while query.next():
-        car_id = query.value(0)
-        car_code = query.value(1)
-        registration = query.value(2)
+        rows.append((query.value(0), query.value(1), query.value(2)))
+    return rows
+
 
+def process_rows(db, rows):
+    update = QSqlQuery(db)
+    update.prepare("UPDATE cars SET car_code = ? WHERE id = ?")
+    for car_id, car_code, registration in rows:
         if not car_code or not registration:
             continue
 
@@ -28,21 +36,19 @@ def update_car_codes(db):
         base = car_code[:8]
         new_code = f"{base}{registration}"
 
-        update = QSqlQuery(db)
-        update.prepare("UPDATE cars SET car_code = ? WHERE id = ?")
         update.addBindValue(new_code)
         update.addBindValue(car_id)
 
         if not update.exec():
             print(f"❌ Update failed for {car_id}: {update.lastError().text()}")
-        else:
-            print(f"✅ Updated {car_id}: {car_code} → {new_code}")
+            return False
+        print(f"✅ Updated {car_id}: {car_code} → {new_code}")
+    return True
 
 
 if __name__ == "__main__":
     print("🚗 Running maintenance: update_car_codes.py")
-    db = connect_to_sqlite_db("../car_rental.db")  # adjust path if needed
-    if db:
-        update_car_codes(db)
-        db.close()
-        print("🎉 Done!")
+    init_qt()
+    result = run_job("update_car_code_logic", DEFAULT_DB)
+    report(*result)
+    sys.exit(0 if result[3] else 1)
@@ -0,0 +1,176 @@
+from datetime import date
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QBrush, QColor, QPainter
+from PySide6.QtSql import QSqlQuery, QSqlTableModel
+from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem
+
+
+StatusRole = Qt.ItemDataRole.UserRole + 1
+
+# state -> (row background, badge color, tooltip)
+STATUS_STYLES = {
+    "available": ("#e8f5e9", "#43a047", "Available"),
+    "rented": ("#e3f2fd", "#1e88e5", "Rented out"),
+    "due_today": ("#fff8e1", "#fb8c00", "Due back today"),
+    "overdue": ("#ffebee", "#e53935", "Overdue"),
+    "in_service": ("#eceff1", "#757575", "In service"),
+}
+
+# brushes are built once, painting only looks them up
+_BACKGROUNDS = {state: QBrush(QColor(bg)) for state, (bg, _, _) in STATUS_STYLES.items()}
+_BADGES = {state: QBrush(QColor(badge)) for state, (_, badge, _) in STATUS_STYLES.items()}
+_BADGE_SIZE = 8
+_BADGE_MARGIN = 6
+
+_NOT_CACHED = object()
+_DAY_CHECK_MS = 60 * 1000
+
+
+# --- Rules: row values -> state (None = no styling) ---
+def _return_state(return_date, today):
+    if not return_date:
+        return "rented"
+    day = str(return_date)[:10]  # "YYYY-MM-DD HH:MM:SS" -> "YYYY-MM-DD"
+    if day < today:
+        return "overdue"
+    if day == today:
+        return "due_today"
+    return "rented"
+
+
+def car_state(values, open_rentals, today):
+    if values["is_available"]:
+        return "available"
+    if values["car_code"] not in open_rentals:
+        return "in_service"  # not available but nobody has it
+    return _return_state(open_rentals[values["car_code"]], today)
+
+
+def rental_state(values, open_rentals, today):
+    if values["is_returned"]:
+        return None
+    return _return_state(values["return_date"], today)
+
+
+CAR_RULE = (car_state, ("car_code", "is_available"))
+RENTAL_RULE = (rental_state, ("return_date", "is_returned"))
+
+
+def load_open_rentals(db):
+    open_rentals = {}
+    query = QSqlQuery(db)
+    if not query.exec("SELECT car_code, MIN(return_date) FROM rentals WHERE is_returned = 0 GROUP BY car_code"):
+        print("Open rentals query failed:", query.lastError().text())
+        return open_rentals
+    while query.next():
+        open_rentals[query.value(0)] = query.value(1)
+    return open_rentals
+
+
+# --- Model with a per-row state cache ---
+class StatusTableModel(QSqlTableModel):
+    def __init__(self, parent, db, rule):
+        super().__init__(parent, db)
+        self._rule, self._fields = rule
+        self._cache = {}  # row -> state
+        self._columns = {}
+        self._open_rentals = {}
+        self._today = ""
+
+        self.modelReset.connect(self._reset_cache)
+        # SQLite rows are fetched lazily in batches, appending a batch must not throw the cache away
+        self.rowsInserted.connect(self._invalidate_from)
+        self.rowsRemoved.connect(self._invalidate_from)
+        self.dataChanged.connect(self._invalidate_rows)
+
+        # "due today" / "overdue" move at midnight even when nothing in the database changes
+        self._day_timer = QTimer(self)
+        self._day_timer.timeout.connect(self._check_day)
+        self._day_timer.start(_DAY_CHECK_MS)
+
+    def _reset_cache(self, *args):
+        self._cache.clear()
+        self._columns = {field: self.fieldIndex(field) for field in self._fields}
+        self._today = date.today().isoformat()
+        if "car_code" in self._columns and "is_available" in self._columns:
+            self._open_rentals = load_open_rentals(self.database())
+
+    def follow(self, model):
+        # car states depend on rentals, so refresh whenever a rentals model changes
+        for signal in (model.modelReset, model.rowsInserted, model.rowsRemoved, model.dataChanged):
+            signal.connect(self._refresh_states)
+
+    def _refresh_states(self, *args):
+        self._reset_cache()
+        if self.rowCount() and self.columnCount():
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1), [StatusRole]
+            )
+
+    def _check_day(self):
+        if date.today().isoformat() != self._today:
+            self._refresh_states()
+
+    def _invalidate_from(self, parent, first, last):
+        # rows at or after first moved (or are new), rows before it keep their cached state
+        for row in [row for row in self._cache if row >= first]:
+            del self._cache[row]
+
+    def _invalidate_rows(self, top_left, bottom_right, roles=()):
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self._cache.pop(row, None)
+
+    def row_state(self, row):
+        state = self._cache.get(row, _NOT_CACHED)
+        if state is _NOT_CACHED:
+            # plain loop, zero-argument super() in a comprehension only works on Python 3.12+
+            values = {}
+            for field, column in self._columns.items():
+                values[field] = QSqlTableModel.data(self, self.index(row, column))
+            state = self._rule(values, self._open_rentals, self._today)
+            self._cache[row] = state
+        return state
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == StatusRole:
+            return self.row_state(index.row())
+        if role == Qt.ItemDataRole.ToolTipRole:
+            state = self.row_state(index.row())
+            return STATUS_STYLES[state][2] if state else None
+        return super().data(index, role)
+
+
+# --- Delegate: background + status badge in the first column ---
+class StatusDelegate(QStyledItemDelegate):
+    def sizeHint(self, option, index):
+        # leave room for the badge so resizeColumnsToContents() doesn't clip the first column
+        size = super().sizeHint(option, index)
+        if index.column() == 0:
+            size.setWidth(size.width() + _BADGE_SIZE + 2 * _BADGE_MARGIN)
+        return size
+
+    def paint(self, painter, option, index):
+        state = index.data(StatusRole)
+        if not state:
+            super().paint(painter, option, index)
+            return
+
+        painter.fillRect(option.rect, _BACKGROUNDS[state])
+        if index.column() != 0:
+            super().paint(painter, option, index)
+            return
+
+        rect = option.rect
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(_BADGES[state])
+        painter.drawEllipse(
+            rect.left() + _BADGE_MARGIN, rect.center().y() - _BADGE_SIZE // 2, _BADGE_SIZE, _BADGE_SIZE
+        )
+        painter.restore()
+
+        shifted = QStyleOptionViewItem(option)
+        shifted.rect = rect.adjusted(_BADGE_SIZE + 2 * _BADGE_MARGIN, 0, 0, 0)
+        super().paint(painter, shifted, index)